@@ -1,4 +1,5 @@
 import os
+import json
 import pandas as pd
 from dotenv import load_dotenv
 from functools import lru_cache
@@ -680,11 +681,16 @@ This view in the {db_name} database provides a consolidated, business-friendly r
         description += view_description
         
         # Combine all information into a dictionary
+        columns = view_schema_df['column_name'].tolist()
         view_info = {
             "schema": description,
-            "columns": view_schema_df['column_name'].tolist(),
+            "columns": columns,
+            # Column list as rendered in the insights prompt, joined once per cached view
+            "columns_csv": ", ".join(columns) or "unknown",
             "sample_data": sample_df.to_dict(orient='records'),
-            "distinct_values": distinct_values_map  # Pass this for more structured use later
+            "distinct_values": distinct_values_map,  # Pass this for more structured use later
+            # First few distinct values per column, serialized once for the insights prompt
+            "example_values_json": json.dumps({k: v[:5] for k, v in distinct_values_map.items()}, default=str)
         }
         
         return view_info
@@ -693,8 +699,10 @@ This view in the {db_name} database provides a consolidated, business-friendly r
         return {
             "schema": "Error: Could not retrieve database schema information.",
             "columns": [],
+            "columns_csv": "unknown",
             "sample_data": [],
-            "distinct_values": {}
+            "distinct_values": {},
+            "example_values_json": "{}"
         }
 
 @lru_cache(maxsize=1)
@@ -60,13 +60,14 @@ try:
 except Exception as e:
     print(f"Warning: Failed to initialize {LLM_MODEL} model at startup: {str(e)}")
 
-def call_llm(prompt, temperature=0.2):
+def call_llm(prompt, temperature=0.2, json_mode=False):
     """
     Generic function to call the configured LLM
     
     Args:
         prompt: The prompt to send to the LLM
         temperature: Temperature for generation (lower is more deterministic)
+        json_mode: Ask the provider for a bare JSON response (no prose or code fences)
         
     Returns:
         The LLM's response as text
@@ -74,10 +75,13 @@ def call_llm(prompt, temperature=0.2):
     if LLM_MODEL == "gemini":
         model = init_model()  # Will use the cached instance
         # Respect temperature to reduce first-run variability and improve determinism when set to 0.0
+        generation_options = {"temperature": temperature}
+        if json_mode:
+            generation_options["response_mime_type"] = "application/json"
         try:
             response = model.generate_content(
                 prompt,
-                generation_config=genai.types.GenerationConfig(temperature=temperature)
+                generation_config=genai.types.GenerationConfig(**generation_options)
             )
         except Exception:
             # Fallback for older SDKs that may not support types.GenerationConfig
@@ -85,6 +89,9 @@ def call_llm(prompt, temperature=0.2):
         return getattr(response, "text", str(response))
     elif LLM_MODEL == "deepseek":
         client = init_model()  # Will use the cached instance
+        request_options = {}
+        if json_mode:
+            request_options["response_format"] = {"type": "json_object"}
         completion = client.chat.completions.create(
             extra_headers={
                 "HTTP-Referer": SITE_URL,
@@ -97,7 +104,8 @@ def call_llm(prompt, temperature=0.2):
                     "role": "user",
                     "content": prompt
                 }
-            ]
+            ],
+            **request_options
         )
         return completion.choices[0].message.content
     else:
@@ -13,12 +13,243 @@ import json
 import re
 import logging
 import time
+import heapq
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import cycle
+from operator import itemgetter
+import numpy as np
+import pandas as pd
 logger = logging.getLogger(__name__)
 
+# Translation table that strips spaces and underscores when normalising column names
+_STRIP_TBL = str.maketrans('', '', ' _')
+
+# Substrings that mark a column as time-related / date-like when detecting chart layouts
+_TIME_TERMS = ('year', 'month', 'day', 'date', 'time', 'quarter')
+_DATE_TERMS = ('date', 'time', 'year', 'month', 'day')
+
+# "P3 New", "Category A" style category mentions, matched against the title-cased query
+_CATEGORY_PAT = re.compile(r'\b[A-Z][A-Za-z0-9]*\s+[A-Z][A-Za-z0-9]*\b')
+_NON_CATEGORY_PHRASES = frozenset(('Job Count', 'Data Table', 'Chart Type', 'By Month', 'Per Month', 'Each Month'))
+# Explicit comparison wording used to annotate single-series comparison charts
+_COMPARISON_HINT_PAT = re.compile(r'billable.*non.?billable|vs|versus|comparing', re.IGNORECASE)
+# Follow-up question clean-up used by GenerateInsights._sanitize_followups
+_PARENS_PAT = re.compile(r"\(([^)]*)\)")
+_QUOTED_PAT = re.compile(r"'([^']+)'")
+_MULTISPACE_PAT = re.compile(r"\s{2,}")
+
+# Enhanced chart type keywords mapping with primary and secondary chart types
+# Only including charts that are enabled in config.js (marked as true)
+_CHART_KEYWORDS = {
+    # Core supported charts (enabled in config.js)
+    'pie': {
+        'keywords': ['pie', 'pie chart', 'semi pie', 'half pie', 'semi pie chart', 'half pie chart'],
+        'secondary': 'doughnut'
+    },
+    'column': {
+        'keywords': ['column', 'column chart', 'vertical bar', 'vertical bars'],
+        'secondary': 'bar'
+    },
+    'bar': {
+        'keywords': ['bar', 'bar chart', 'horizontal bar', 'horizontal bars'],
+        'secondary': 'column'
+    },
+    'line': {
+        'keywords': ['line', 'line chart', 'trend line', 'trend chart'],
+        'secondary': 'area'
+    },
+    'area': {
+        'keywords': ['area', 'area chart', 'filled line'],
+        'secondary': 'line'
+    },
+    'doughnut': {
+        'keywords': ['ring', 'ring chart', 'semi ring', 'half ring', 'semi ring chart', 'half ring chart', 'doughnut', 'donut'],
+        'secondary': 'pie'
+    },
+    'scatter': {
+        'keywords': ['scatter', 'scatter plot', 'scatter chart', 'dot plot'],
+        'secondary': 'line'
+    },
+    'stackedColumn': {
+        'keywords': ['stacked column', 'stacked', 'stacked bar', 'layered'],
+        'secondary': 'column'
+    },
+    # Advanced charts that are enabled in config.js
+    'combo': {
+        'keywords': ['combo chart', 'combination chart', 'mixed chart'],
+        'secondary': 'column'
+    },
+    'kpi': {
+        'keywords': ['kpi', 'metric', 'single value', 'key performance', 'indicator'],
+        'secondary': 'column'
+    }
+    # Note: Disabled charts from config.js are not included:
+    # - spline, bubble, stacked, stackedBar, radar, polar, funnel, pyramid, heatmap, boxplot, waterfall
+    # - map_scatter, map_bubble, map_pie, map_bubble_pie, pivot, web
+}
+
+def _build_keyword_scan(chart_keywords):
+    """
+    Flatten the chart keyword mapping into (keyword, primary, secondary) entries in priority order.
+    A keyword that contains another keyword of the same or a higher-priority chart type can never
+    decide the match (e.g. 'pie chart' vs 'pie', 'stacked column' vs 'column'), so it is dropped.
+    
+    Args:
+        chart_keywords (dict): Mapping of chart type to its keywords and secondary chart type
+        
+    Returns:
+        tuple: (keyword, primary_chart_type, secondary_chart_type) entries to scan in order
+    """
+    ranked = [(keyword, rank, chart_type, chart_info['secondary'])
+              for rank, (chart_type, chart_info) in enumerate(chart_keywords.items())
+              for keyword in chart_info['keywords']]
+    return tuple(
+        (keyword, chart_type, secondary)
+        for keyword, rank, chart_type, secondary in ranked
+        if not any(other != keyword and other in keyword and other_rank <= rank
+                   for other, other_rank, _, _ in ranked)
+    )
+
+_CHART_KEYWORD_SCAN = _build_keyword_scan(_CHART_KEYWORDS)
+
+# Any of these substrings marks a query as a comparison. Phrases that contain a shorter
+# entry (e.g. 'differences' contains 'difference') are redundant and dropped.
+_COMPARISON_KEYWORDS = (
+    'compare', 'comparing', 'comparison', 'vs', 'versus', 'against',
+    'difference', 'differences', 'between', 'and', 'contrast',
+    'side by side', 'side-by-side', 'breakdown by', 'split by',
+    'grouped by', 'segmented by', 'categorized by', 'separated by'
+)
+_COMPARISON_KEYWORDS = tuple(keyword for keyword in _COMPARISON_KEYWORDS
+                             if not any(other != keyword and other in keyword for other in _COMPARISON_KEYWORDS))
+
+# Keyword chart types needing more than one numeric column
+_MIN_NUMERIC_COLUMNS = {'combo': 2}
+
+# Multi-series palette from config.js as (backgroundColor, borderColor) pairs
+_SERIES_PALETTE = (
+    ('rgba(254, 99, 131, 0.7)', 'rgba(254, 99, 131, 1)'),    # #fe6383
+    ('rgba(202, 203, 206, 0.7)', 'rgba(202, 203, 206, 1)'),  # #cacbce
+    ('rgba(153, 102, 255, 0.7)', 'rgba(153, 102, 255, 1)'),  # #9966ff
+    ('rgba(54, 162, 235, 0.7)', 'rgba(54, 162, 235, 1)'),    # #36a2eb
+    ('rgba(255, 204, 85, 0.7)', 'rgba(255, 204, 85, 1)'),    # #ffcc55
+    ('rgba(76, 192, 192, 0.7)', 'rgba(76, 192, 192, 1)'),    # #4ac0c0
+    ('rgba(255, 159, 64, 0.7)', 'rgba(255, 159, 64, 1)'),    # #ff9f40
+    ('rgba(66, 185, 130, 0.7)', 'rgba(66, 185, 130, 1)')     # #42b982
+)
+
+# Chart.js options shared by every chart; treated as read-only
+_DEFAULT_OPTIONS = {"responsive": True, "maintainAspectRatio": False}
+
+# config.js palette shared by the standalone chart builders, as (backgroundColor, borderColor) pairs
+_CONFIG_COLOR_PAIRS = (
+    ('rgba(254, 99, 131, 0.8)', 'rgba(254, 99, 131, 1)'),    # #fe6383
+    ('rgba(202, 203, 206, 0.8)', 'rgba(202, 203, 206, 1)'),  # #cacbce
+    ('rgba(153, 102, 255, 0.8)', 'rgba(153, 102, 255, 1)'),  # #9966ff
+    ('rgba(54, 162, 235, 0.8)', 'rgba(54, 162, 235, 1)'),    # #36a2eb
+    ('rgba(255, 204, 85, 0.8)', 'rgba(255, 204, 85, 1)'),    # #ffcc55
+    ('rgba(76, 192, 192, 0.8)', 'rgba(76, 192, 192, 1)'),    # #4ac0c0
+    ('rgba(255, 159, 64, 0.8)', 'rgba(255, 159, 64, 1)'),    # #ff9f40
+    ('rgba(66, 185, 130, 0.8)', 'rgba(66, 185, 130, 1)')     # #42b982
+)
+
+# Highly contrasting colors for comparison queries
+_COMPARISON_PALETTE = (
+    ('rgba(254, 99, 131, 0.8)', 'rgba(254, 99, 131, 1)'),    # Pink/Red (#fe6383)
+    ('rgba(54, 162, 235, 0.8)', 'rgba(54, 162, 235, 1)'),    # Blue (#36a2eb)
+    ('rgba(76, 192, 192, 0.8)', 'rgba(76, 192, 192, 1)'),    # Teal (#4ac0c0)
+    ('rgba(255, 159, 64, 0.8)', 'rgba(255, 159, 64, 1)'),    # Orange (#ff9f40)
+    ('rgba(153, 102, 255, 0.8)', 'rgba(153, 102, 255, 1)'),  # Purple (#9966ff)
+    ('rgba(255, 204, 85, 0.8)', 'rgba(255, 204, 85, 1)'),    # Yellow (#ffcc55)
+    ('rgba(66, 185, 130, 0.8)', 'rgba(66, 185, 130, 1)'),    # Green (#42b982)
+    ('rgba(202, 203, 206, 0.8)', 'rgba(202, 203, 206, 1)')   # Gray (#cacbce)
+)
+
+# Common geographical column indicators
+_GEO_INDICATORS = ('state', 'country', 'region', 'city', 'location', 'area', 'territory', 'zone')
+
+# Instructions shared by every insights request. Kept free of per-request values so every
+# prompt starts with the same text; the per-view column block follows it in exec.
+_INSIGHTS_PROMPT_PREFIX = """You are a data analyst AI assistant. Based on the user's query and the resulting data, provide:
+
+1. **Insights**: A concise, informative summary (2-3 sentences) highlighting key findings, trends, patterns, or notable observations from the data.
+
+2. **Follow-up Questions**: Generate 2-3 relevant follow-up questions that would help the user explore the data further. These must be:
+   - Directly related to the current dataset and the user's intent
+   - Feasible using ONLY the `GetJobDetails_FieldService` view columns
+   - Concrete (reference real column names and, when helpful, example values from the view)
+
+**Guidelines**:
+- Insights should be specific and actionable, not generic
+- Follow-up questions must be executable against the `GetJobDetails_FieldService` view
+- Focus on business value and actionable insights
+- Keep insights concise but informative
+- Make follow-up questions specific enough to be directly actionable
+
+**Response Format**:
+Return a JSON object with exactly this structure:
+{
+    "insights": "Your concise insights here (2-3 sentences)",
+    "follow_up_questions": [
+        "Specific follow-up question 1",
+        "Specific follow-up question 2", 
+        "Specific follow-up question 3"
+    ]
+}
+
+**IMPORTANT**: Return ONLY the JSON object, no additional text.
+
+The request details follow.
+"""
+
+_JSON_DECODER = json.JSONDecoder()
+
+# Fallback insights when the LLM response holds no usable JSON, and when generation fails.
+# Questions are tuples so the shared constants cannot be mutated through a returned result
+_INSIGHTS_PARSE_FALLBACK = (
+    "Analysis completed successfully. The data shows the requested information based on your query.",
+    (
+        "What time period would you like to analyze next?",
+        "Would you like to see this data broken down by different categories?",
+        "What additional metrics would be helpful to compare?"
+    )
+)
+_INSIGHTS_ERROR_FALLBACK = (
+    "Data analysis completed. The results show information relevant to your query.",
+    (
+        "What time period would you like to explore?",
+        "Would you like to see different data groupings?",
+        "What additional analysis would be helpful?"
+    )
+)
+
+# View info used when it cannot be fetched; same shape as db_utils' error result
+_EMPTY_VIEW_INFO = {
+    "columns": [],
+    "columns_csv": "unknown",
+    "distinct_values": {},
+    "example_values_json": "{}"
+}
+
+# Upper bound on the characters any one per-request prompt section may contribute
+_INSIGHTS_SECTION_MAX_CHARS = 4096
+
+# Parsed insights responses keyed by a hash of the full prompt, bounded and expiring so
+# repeated requests skip the LLM without serving stale data indefinitely
+_INSIGHTS_CACHE = OrderedDict()
+_INSIGHTS_CACHE_TTL_SECONDS = 3600
+_INSIGHTS_CACHE_MAX_ENTRIES = 1024
+_INSIGHTS_CACHE_LOCK = threading.Lock()
+
+@lru_cache(maxsize=1024)
 def format_title_text(text):
     """
     Format column names and other text for display in chart titles.
     Converts camelCase, PascalCase, and snake_case to proper title case with spaces.
+    Results are cached since the same column names are formatted repeatedly.
     
     Args:
         text (str): The text to format
@@ -47,6 +278,189 @@ def format_title_text(text):
     
     return formatted_text
 
+def _labels_from(series):
+    """
+    Convert a pandas Series (or Index) into a list of chart label strings.
+    Missing values are rendered as "Unknown"; conversion happens in pandas rather than per element,
+    except for datetime/timedelta values, whose pandas string form drops a midnight time part.
+    
+    Args:
+        series (pandas.Series | pandas.Index): The column or index to convert
+        
+    Returns:
+        list[str]: Label strings
+    """
+    if series.dtype.kind in "mM":
+        return ["Unknown" if x is pd.NaT else str(x) for x in series.tolist()]
+    # Nullable (Int64, boolean, ...) and categorical dtypes reject a string fill value
+    if isinstance(series.dtype, pd.api.extensions.ExtensionDtype) and not pd.api.types.is_string_dtype(series.dtype):
+        series = series.astype(object)
+    return series.fillna("Unknown").astype(str).to_numpy().tolist()
+
+def _str_labels(series):
+    """
+    Convert a pandas Series into chart label strings using pandas' own string conversion,
+    which renders all-midnight datetimes date-only. Missing values are rendered as "Unknown".
+    
+    Args:
+        series (pandas.Series): The column to convert
+        
+    Returns:
+        list[str]: Label strings
+    """
+    return series.astype(str).fillna("Unknown").to_numpy().tolist()
+
+def _data_from(series):
+    """
+    Convert a numeric pandas Series into a plain list of chart values via the NumPy fast path.
+    
+    Args:
+        series (pandas.Series): The column to convert
+        
+    Returns:
+        list: Python scalars in row order
+    """
+    return series.to_numpy().tolist()
+
+def _columns_data_from(df, cols):
+    """
+    Convert several numeric columns into plain lists of chart values, one list per column.
+    Columns sharing a single dtype are extracted as one 2-D block; mixed dtypes are converted
+    column by column so integer series are not upcast to floats.
+    
+    Args:
+        df (pandas.DataFrame): The source data
+        cols (list): Column names to extract
+        
+    Returns:
+        list[list]: Values for each column, in the order of cols
+    """
+    frame = df[cols]
+    if len(set(frame.dtypes)) == 1:
+        return frame.to_numpy().T.tolist()
+    return [_data_from(frame[col]) for col in cols]
+
+@lru_cache(maxsize=16)
+def _column_label_patterns(columns):
+    """
+    Compile one whole-word, case-insensitive alternation matching any raw column name,
+    plus the display label for each name. Longer names come first in the alternation to
+    avoid partial replacements (e.g., Job vs JobId).
+    
+    Args:
+        columns (tuple): Raw column names of the view
+        
+    Returns:
+        tuple: (compiled pattern, dict of lower-cased column name -> display label)
+    """
+    columns_sorted = sorted(columns, key=len, reverse=True)
+    labels = {}
+    for col in columns_sorted:
+        labels.setdefault(col.lower(), format_title_text(col))
+    pattern = re.compile(r"\b(?:" + "|".join(re.escape(col) for col in columns_sorted) + r")\b", re.IGNORECASE)
+    return pattern, labels
+
+def _extract_json_object(text):
+    """
+    Extract the first complete JSON object embedded in free-form LLM output.
+    Each candidate "{" is handed to the C JSON decoder, which stops at the matching
+    closing brace (string contents included), so no regex scan or backtracking is needed.
+    
+    Args:
+        text (str): Raw response text, possibly with a preamble or trailing prose
+        
+    Returns:
+        dict: The decoded object, or None when the text holds no JSON object
+    """
+    start = text.find('{')
+    while start != -1:
+        try:
+            obj, _ = _JSON_DECODER.raw_decode(text, start)
+            if isinstance(obj, dict):
+                return obj
+        except ValueError:
+            pass
+        start = text.find('{', start + 1)
+    return None
+
+def _clip(text, limit=_INSIGHTS_SECTION_MAX_CHARS):
+    """
+    Bound a prompt section by keeping its head and tail around a truncation marker.
+    
+    Args:
+        text (str): Section text
+        limit (int): Maximum number of characters kept from the original text
+        
+    Returns:
+        str: The text unchanged when within the limit, otherwise its clipped form
+    """
+    if len(text) <= limit:
+        return text
+    head = limit // 2
+    tail = limit - head
+    return f"{text[:head]}\n...[{len(text) - limit} chars truncated]...\n{text[-tail:]}"
+
+def _get_cached_insights(key):
+    """
+    Look up a parsed insights response cached for an identical prompt.
+    
+    Args:
+        key (bytes): Hash of the insights prompt
+        
+    Returns:
+        dict: A copy of the cached response, or None when missing or expired
+    """
+    with _INSIGHTS_CACHE_LOCK:
+        entry = _INSIGHTS_CACHE.get(key)
+        if entry is None:
+            return None
+        if entry["expires_at"] < time.time():
+            del _INSIGHTS_CACHE[key]
+            return None
+        _INSIGHTS_CACHE.move_to_end(key)
+        result = entry["result"]
+    return {**result, "follow_up_questions": list(result["follow_up_questions"])}
+
+def _cache_insights(key, result):
+    """
+    Cache a parsed insights response, evicting the least recently used entry when full.
+    
+    Args:
+        key (bytes): Hash of the insights prompt
+        result (dict): Parsed response with insights and follow_up_questions
+    """
+    with _INSIGHTS_CACHE_LOCK:
+        _INSIGHTS_CACHE[key] = {
+            "result": {**result, "follow_up_questions": list(result["follow_up_questions"])},
+            "expires_at": time.time() + _INSIGHTS_CACHE_TTL_SECONDS
+        }
+        _INSIGHTS_CACHE.move_to_end(key)
+        while len(_INSIGHTS_CACHE) > _INSIGHTS_CACHE_MAX_ENTRIES:
+            _INSIGHTS_CACHE.popitem(last=False)
+
+def _year_month_labels(year, month, fallback):
+    """
+    Build "YYYY-MM" chart labels from year and month Series.
+    Rows where either part is missing or zero take their label from the fallback Series instead.
+    
+    Args:
+        year (pandas.Series): Year values
+        month (pandas.Series): Month number values
+        fallback (pandas.Series): Column used for rows without a usable year and month
+        
+    Returns:
+        list[str]: Label strings
+    """
+    year_num = pd.to_numeric(year, errors='coerce')
+    month_num = pd.to_numeric(month, errors='coerce')
+    valid = year_num.notna() & month_num.notna() & (year_num != 0) & (month_num != 0)
+    
+    labels = pd.Series(_labels_from(fallback), index=fallback.index, dtype=object)
+    if valid.any():
+        labels[valid] = (year_num[valid].astype('int64').astype(str) + '-' +
+                         month_num[valid].astype('int64').astype(str).str.zfill(2))
+    return labels.tolist()
+
 class Node:
     """Base Node class that defines the interface for all nodes"""
     
@@ -249,7 +663,7 @@ OR
                 raise ValueError("Invalid response format")
             # Log the generated SQL if present
             if result["type"] == "sql":
-                logger.info(f"Generated SQL Query: {result['content']}")
+                logger.info("Generated SQL Query: %s", result['content'])
             return result
         except Exception as e:
             # If parsing fails, return a meaningful clarification request
@@ -317,11 +731,11 @@ class ExecuteSQL(Node):
             response = execute_query(sql_query, db_name=db_name)
             
             # Format column names for better display in tables
-            formatted_columns = {col: format_title_text(col) for col in response.columns}
-            response_formatted = response.rename(columns=formatted_columns)
+            formatted_columns = [format_title_text(col) for col in response.columns]
             
-            # If successful execution, convert the DataFrame to a list of dictionaries with formatted column names
-            records = response_formatted.to_dict(orient="records")
+            # If successful execution, convert the DataFrame to a list of dictionaries with formatted column names.
+            # Rows are zipped straight from plain tuples so no renamed copy of the DataFrame is materialized.
+            records = [dict(zip(formatted_columns, row)) for row in response.itertuples(index=False, name=None)]
             
             # Generate chart data only if charts are enabled
             chart_data = None
@@ -332,7 +746,7 @@ class ExecuteSQL(Node):
             return {"data": records, "chart": chart_data}
             
         except Exception as e:
-            logger.error(f"SQL Execution Error: {e}\nQuery: {sql_query}")
+            logger.error("SQL Execution Error: %s\nQuery: %s", e, sql_query)
             # Return a generic, user-friendly error message
             return {"error": "I encountered an issue while processing your request. Please try rephrasing your question."}
             
@@ -349,7 +763,7 @@ class ExecuteSQL(Node):
         # Step 1: Hard rules for obvious exclusions (fast and reliable)
         definite_exclusions = []
         for col in numeric_cols:
-            col_lower = col.lower().replace(' ', '').replace('_', '')
+            col_lower = col.lower().translate(_STRIP_TBL)
             # These are almost never chart values
             if any(term in col_lower for term in ['month', 'year', 'day', 'date', 'id', 'sequence', 'number']):
                 # But allow if the query specifically asks for this type of data
@@ -371,7 +785,7 @@ class ExecuteSQL(Node):
         
         for col in remaining_cols:
             score = 0
-            col_clean = col.lower().replace(' ', '').replace('_', '')
+            col_clean = col.lower().translate(_STRIP_TBL)
             
             # Positive scoring for value indicators
             value_terms = ['jobs', 'sales', 'revenue', 'count', 'total', 'amount', 'cost', 'profit', 'hours']
@@ -381,7 +795,7 @@ class ExecuteSQL(Node):
             
             # Heavy boost for columns that match query entities
             for entity in query_entities:
-                entity_clean = entity.lower().replace(' ', '').replace('_', '')
+                entity_clean = entity.lower().translate(_STRIP_TBL)
                 if entity_clean in col_clean or col_clean in entity_clean:
                     score += 100
                 # Partial match
@@ -397,7 +811,7 @@ class ExecuteSQL(Node):
         selected_columns.sort(key=lambda x: column_scores.get(x, 0), reverse=True)
         
         # For comparison queries, be more selective
-        if self._detect_comparison_intent(query_text):
+        if self._detect_comparison_intent(query_lower):
             return selected_columns[:4]  # Max 4 comparison series
         else:
             return selected_columns[:6]  # Max 6 series for non-comparison
@@ -488,7 +902,7 @@ class ExecuteSQL(Node):
         for keyword, patterns in value_keywords.items():
             if keyword in query_lower:
                 for col in numeric_cols:
-                    col_lower = col.lower().replace(' ', '').replace('_', '')
+                    col_lower = col.lower().translate(_STRIP_TBL)
                     for pattern in patterns:
                         if pattern.replace('_', '') in col_lower:
                             return col
@@ -562,19 +976,28 @@ class ExecuteSQL(Node):
         numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
         non_numeric_cols = df.select_dtypes(exclude=['number']).columns.tolist()
         
+        # Every chart type below needs at least one numeric value column
+        if not numeric_cols:
+            return None
+        
+        # Check for single metric KPI before paying for keyword and entity detection
+        if len(df) == 1 and len(numeric_cols) == 1:
+            return self._create_kpi_widget(df, numeric_cols[0])
+        
         # Check for keyword-based chart selection first (like Zoho Ask Zia)
-        chart_type_result = self._detect_chart_type_from_keywords(query_text.lower())
+        query_lower = query_text.lower()
+        chart_type_result = self._detect_chart_type_from_keywords(query_lower)
         primary_chart_type, secondary_chart_type = chart_type_result if chart_type_result[0] else (None, None)
         
-        # Check for comparison keywords in the query
-        is_comparison_query = self._detect_comparison_intent(query_text.lower())
+        # A lone multi-row column can only be charted when a chart type was explicitly requested
+        if not primary_chart_type and len(df.columns) < 2:
+            return None
         
-        # Check for single metric KPI
-        if len(df) == 1 and len(numeric_cols) == 1:
-            return self._create_kpi_widget(df, numeric_cols[0])
+        # Check for comparison keywords in the query
+        is_comparison_query = self._detect_comparison_intent(query_lower)
         
         # Geo charts are disabled in simplified configuration
-        # geo_chart = self._detect_geo_chart(df, non_numeric_cols, query_text.lower())
+        # geo_chart = self._detect_geo_chart(df, non_numeric_cols, query_lower)
         # if geo_chart:
         #     return geo_chart
         
@@ -585,10 +1008,30 @@ class ExecuteSQL(Node):
             
             # If primary chart creation fails or the chart type is not suitable for the data
             if primary_chart is None and secondary_chart_type:
-                logger.info(f"Primary chart type '{primary_chart_type}' not suitable for data, falling back to '{secondary_chart_type}'")
+                logger.info("Primary chart type '%s' not suitable for data, falling back to '%s'", primary_chart_type, secondary_chart_type)
                 return self._create_chart_from_keyword(df, secondary_chart_type, numeric_cols, non_numeric_cols, is_comparison_query, query_text)
             elif primary_chart:
                 return primary_chart
+        
+        # Lower-case column names once and classify them in a single pass for the branches below
+        numeric_set = set(numeric_cols)
+        cols_lower = [col.lower() for col in df.columns]
+        cols_lower_set = set(cols_lower)
+        is_time_col = {col: any(time_term in col_lower for time_term in _TIME_TERMS)
+                       for col, col_lower in zip(df.columns, cols_lower)}
+        date_cols, time_related_cols, year_cols, month_cols, value_cols = [], [], [], [], []
+        for col, col_lower in zip(df.columns, cols_lower):
+            if is_time_col[col]:
+                time_related_cols.append(col)
+                if 'year' in col_lower:
+                    year_cols.append(col)
+                if (df[col].dtype in ['datetime64[ns]', 'object'] and
+                        any(date_term in col_lower for date_term in _DATE_TERMS)):
+                    date_cols.append(col)
+            elif col in numeric_set:
+                value_cols.append(col)
+            if 'month' in col_lower:
+                month_cols.append(col)
             
         # If we have exactly 2 columns, one potentially being a category/label and the other a value
         if len(df.columns) == 2:
@@ -597,8 +1040,8 @@ class ExecuteSQL(Node):
                 # Use non-numeric column as labels
                 label_col = non_numeric_cols[0]
                 value_col = self._select_primary_value_column(df, numeric_cols, query_text)
-                labels = [str(x) if x is not None else "Unknown" for x in df[label_col].tolist()]
-                data = df[value_col].tolist()
+                labels = _labels_from(df[label_col])
+                data = _data_from(df[value_col])
                 
                 # Enhanced chart type selection
                 chart_type = self._determine_optimal_chart_type(data, labels)
@@ -622,16 +1065,12 @@ class ExecuteSQL(Node):
                         "borderColor": 'rgba(254, 99, 131, 1)',
                         "borderWidth": 2
                     }],
-                    "options": {
-                        "responsive": True,
-                        "maintainAspectRatio": False
-                    }
+                    "options": _DEFAULT_OPTIONS
                 }
             
             # If we have two numeric columns, check if one is time-related
             if len(numeric_cols) == 2:
-                time_related_cols = [col for col in numeric_cols if any(time_term in col.lower() 
-                                   for time_term in ['year', 'month', 'day', 'date', 'time', 'quarter'])]
+                time_related_cols = [col for col in numeric_cols if is_time_col[col]]
                 
                 if time_related_cols:
                     # One column is time-related, treat the other as the value
@@ -640,8 +1079,8 @@ class ExecuteSQL(Node):
                     value_col = self._select_primary_value_column(df, remaining_cols, query_text)
                     
                     # Create labels from time column and data from value column
-                    labels = [str(x) if x is not None else "Unknown" for x in df[time_col].astype(str).tolist()]
-                    data = df[value_col].tolist()
+                    labels = _str_labels(df[time_col])
+                    data = _data_from(df[value_col])
                     
                     return {
                         "type": "column",
@@ -654,10 +1093,7 @@ class ExecuteSQL(Node):
                             "borderColor": 'rgba(202, 203, 206, 1)',
                             "borderWidth": 2
                         }],
-                        "options": {
-                            "responsive": True,
-                            "maintainAspectRatio": False
-                        }
+                        "options": _DEFAULT_OPTIONS
                     }
                 else:
                     # Both columns are actual values - create scatter plot
@@ -668,10 +1104,10 @@ class ExecuteSQL(Node):
                     return {
                         "type": "scatter",
                         "title": f"{format_title_text(y_col)} vs {format_title_text(x_col)}",
-                        "labels": [str(x) if x is not None else "Unknown" for x in df.index.tolist()],  # Use index as labels for scatter
+                        "labels": _labels_from(df.index.to_series()),  # Use index as labels for scatter
                         "datasets": [{
                             "label": f"{format_title_text(y_col)} vs {format_title_text(x_col)}",
-                            "data": df[y_col].tolist(),
+                            "data": _data_from(df[y_col]),
                             "backgroundColor": 'rgba(54, 162, 235, 0.5)',  # #36a2eb from config
                             "borderColor": 'rgba(54, 162, 235, 1)',
                             "pointRadius": 5,
@@ -679,8 +1115,7 @@ class ExecuteSQL(Node):
                             "showLine": False
                         }],
                         "options": {
-                            "responsive": True,
-                            "maintainAspectRatio": False,
+                            **_DEFAULT_OPTIONS,
                             "scales": {
                                 "x": {
                                     "title": {
@@ -695,52 +1130,43 @@ class ExecuteSQL(Node):
                     }
                 
         # Check for time-series data (date column + numeric columns)
-        date_cols = [col for col in df.columns if df[col].dtype in ['datetime64[ns]', 'object'] and 
-                     any(date_term in col.lower() for date_term in ['date', 'time', 'year', 'month', 'day'])]
-        
-        if date_cols and len(df.select_dtypes(include=['number']).columns) >= 1:
+        if date_cols and len(numeric_cols) >= 1:
             # Time-series data. If comparison intent and multiple numeric columns exist,
             # create a multi-series line chart; otherwise fall back to single series.
             date_col = date_cols[0]
-            available_numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
-            labels = [str(d) if d is not None else "Unknown" for d in df[date_col].tolist()]
+            available_numeric_cols = numeric_cols
+            labels = _labels_from(df[date_col])
 
             # Try multi-series when appropriate
             filtered_cols = self._select_value_columns_for_chart(df, available_numeric_cols, query_text)
             if (is_comparison_query and len(filtered_cols) >= 2) or len(filtered_cols) >= 2:
                 # Use config.js palette
-                config_colors = [
-                    'rgba(254, 99, 131, 0.8)',
-                    'rgba(54, 162, 235, 0.8)',
-                    'rgba(76, 192, 192, 0.8)',
-                    'rgba(255, 159, 64, 0.8)',
-                    'rgba(153, 102, 255, 0.8)'
-                ]
-                datasets = []
-                for i, col in enumerate(filtered_cols[:5]):
-                    color = config_colors[i % len(config_colors)]
-                    datasets.append({
-                        "label": format_title_text(col),
-                        "data": df[col].tolist(),
-                        "borderColor": color.replace('0.8', '1'),
-                        "backgroundColor": color,
-                        "tension": 0.1,
-                        "fill": False
-                    })
+                palette = _COMPARISON_PALETTE[:5]
+                series_cols = filtered_cols[:5]
+                series_data = _columns_data_from(df, series_cols)
+                datasets = [{
+                    "label": format_title_text(col),
+                    "data": data,
+                    "borderColor": border,
+                    "backgroundColor": fill,
+                    "tension": 0.1,
+                    "fill": False
+                } for col, data, (fill, border) in zip(series_cols, series_data, cycle(palette))]
                 return {
                     "type": "line",
                     "title": "Multi-series trend over time",
                     "labels": labels,
                     "datasets": datasets,
-                    "options": {"responsive": True, "maintainAspectRatio": False}
+                    "options": _DEFAULT_OPTIONS
                 }
 
             # Single-series fallback
             numeric_col = self._select_primary_value_column(df, available_numeric_cols, query_text)
-            data = df[numeric_col].tolist()
-            chart_type = "line"
-            if len(data) > 5 and sum(1 for i in range(1, len(data)) if data[i] >= data[i-1]) > 0.7 * len(data):
-                chart_type = "area"
+            data = _data_from(df[numeric_col])
+            # Use an area chart when the series is mostly non-decreasing (>70% of consecutive steps)
+            values = df[numeric_col].to_numpy(dtype=float, na_value=np.nan)
+            increasing_frac = float((np.diff(values) >= 0).mean()) if values.size > 1 else 0.0
+            chart_type = "area" if len(data) > 5 and increasing_frac > 0.7 else "line"
             return {
                 "type": chart_type,
                 "title": f"{format_title_text(numeric_col)} over time",
@@ -753,40 +1179,29 @@ class ExecuteSQL(Node):
                     "backgroundColor": 'rgba(255, 204, 85, 0.2)',
                     "tension": 0.1
                 }],
-                "options": {"responsive": True, "maintainAspectRatio": False}
+                "options": _DEFAULT_OPTIONS
             }
             
         # For data with multiple numeric columns
-        numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
         if len(numeric_cols) >= 2:
-            # Smart column detection for time-based queries
-            time_related_cols = [col for col in df.columns if any(time_term in col.lower() 
-                               for time_term in ['year', 'month', 'day', 'date', 'time', 'quarter'])]
-            
-            value_cols = [col for col in numeric_cols if not any(time_term in col.lower() 
-                         for time_term in ['year', 'month', 'day', 'date', 'time', 'quarter'])]
-            
-            month_cols = [col for col in df.columns if 'month' in col.lower()]
+            # Smart column detection for time-based queries uses the time_related_cols,
+            # value_cols and month_cols classified above
             
             # Special handling for monthly revenue queries
             if month_cols and value_cols:
                 month_col = month_cols[0]
                 value_col = self._select_primary_value_column(df, value_cols, query_text)  # Use intelligent selection
                 
-                # Create meaningful labels for monthly data
-                labels = []
-                for _, row in df.iterrows():
-                    year = row.get('JobYear', row.get('Year', ''))
-                    month = row.get('JobMonth', row.get('Month', ''))
-                    if year and month:
-                        # Create "YYYY-MM" format labels
-                        labels.append(f"{int(year)}-{int(month):02d}")
-                    else:
-                        # Fallback to string representation of month column
-                        month_val = row[month_col]
-                        labels.append(str(month_val) if month_val is not None else "Unknown")
+                # Create meaningful "YYYY-MM" labels for monthly data
+                year_col = next((col for col in ('JobYear', 'Year') if col in df.columns), None)
+                month_part_col = next((col for col in ('JobMonth', 'Month') if col in df.columns), None)
+                if year_col and month_part_col:
+                    labels = _year_month_labels(df[year_col], df[month_part_col], df[month_col])
+                else:
+                    # Fallback to string representation of month column
+                    labels = _labels_from(df[month_col])
                 
-                data = df[value_col].tolist()
+                data = _data_from(df[value_col])
                 
                 return {
                     "type": "column",  # Use column chart for monthly data
@@ -799,31 +1214,28 @@ class ExecuteSQL(Node):
                         "borderColor": 'rgba(76, 192, 192, 1)',
                         "borderWidth": 2
                     }],
-                    "options": {
-                        "responsive": True,
-                        "maintainAspectRatio": False
-                    }
+                    "options": _DEFAULT_OPTIONS
                 }
             
             # If we have year column but it's constant (same year for all rows), treat it as single-year data
             if time_related_cols and value_cols:
-                year_cols = [col for col in time_related_cols if 'year' in col.lower()]
                 if year_cols:
                     year_col = year_cols[0]
-                    # Check if all years are the same
-                    unique_years = df[year_col].nunique()
-                    if unique_years == 1:
+                    # Check if all (non-null) years are the same with a single equality pass
+                    # rather than hashing the column for nunique()
+                    years = df[year_col].dropna()
+                    if not years.empty and (years == years.iloc[0]).all():
                         # Single year data - find the best label column
-                        potential_label_cols = [col for col in df.columns if col.lower() in 
-                                           ['month', 'monthname', 'sales_month', 'salesmonth'] or 
-                                           ('month' in col.lower() and col not in numeric_cols)]
+                        potential_label_cols = [col for col, col_lower in zip(df.columns, cols_lower) if col_lower in
+                                           ('month', 'monthname', 'sales_month', 'salesmonth') or
+                                           ('month' in col_lower and col not in numeric_set)]
                         
                         if potential_label_cols:
                             label_col = potential_label_cols[0]
                             value_col = self._select_primary_value_column(df, value_cols, query_text)
                             
-                            labels = [str(x) if x is not None else "Unknown" for x in df[label_col].astype(str).tolist()]
-                            data = df[value_col].tolist()
+                            labels = _str_labels(df[label_col])
+                            data = _data_from(df[value_col])
                             
                             return {
                                 "type": "column",
@@ -836,32 +1248,18 @@ class ExecuteSQL(Node):
                                     "borderColor": 'rgba(255, 159, 64, 1)',
                                     "borderWidth": 2
                                 }],
-                                "options": {
-                                    "responsive": True,
-                                    "maintainAspectRatio": False
-                                }
+                                "options": _DEFAULT_OPTIONS
                             }
             
             # If we have an index or id-like column that works as a label
-            potential_label_cols = [col for col in df.columns if col.lower() in 
-                               ['id', 'name', 'category', 'type', 'region', 'location']]
+            potential_label_cols = [col for col, col_lower in zip(df.columns, cols_lower) if col_lower in
+                               ('id', 'name', 'category', 'type', 'region', 'location')]
             
             label_col = potential_label_cols[0] if potential_label_cols else df.columns[0]
-            labels = [str(x) if x is not None else "Unknown" for x in df[label_col].astype(str).tolist()]
+            labels = _str_labels(df[label_col])
             
             # Check for specific patterns in data to determine chart type
             
-            # Check for cyclic data (could benefit from scatter plots)
-            # Cyclic data often has first and last values that are similar
-            # or columns with similar patterns repeating
-            is_cyclic = False
-            if len(numeric_cols) >= 3:
-                # Check if any column has similar start/end values
-                for col in numeric_cols[:3]:  # Check first 3 numeric columns
-                    if abs(df[col].iloc[0] - df[col].iloc[-1]) < 0.2 * df[col].std():
-                        is_cyclic = True
-                        break
-            
             # Check for comparative data (good for scatter or column charts)
             # Comparative data often has multiple metrics for each category
             is_comparative = len(numeric_cols) >= 3 and len(df) <= 10
@@ -872,35 +1270,28 @@ class ExecuteSQL(Node):
             
             # If no columns selected by smart logic, fall back to basic filtering
             if not filtered_numeric_cols:
-                filtered_numeric_cols = [col for col in numeric_cols if not any(time_term in col.lower() 
-                                       for time_term in ['year', 'month', 'day', 'date', 'time', 'quarter'])]
+                filtered_numeric_cols = [col for col in numeric_cols if not is_time_col[col]]
             
             # If we only have one actual value column after filtering, create single-series chart
             if len(filtered_numeric_cols) == 1:
                 value_col = self._select_primary_value_column(df, filtered_numeric_cols, query_text)
-                data = df[value_col].tolist()
+                data = _data_from(df[value_col])
                 
                 # Create meaningful labels for time-based data
                 labels = []
-                if month_cols and 'year' in df.columns.str.lower().tolist():
-                    # Create month-year labels
-                    for _, row in df.iterrows():
-                        year = None
-                        month = None
-                        for col in df.columns:
-                            if 'year' in col.lower():
-                                year = row[col]
-                            elif 'month' in col.lower():
-                                month = row[col]
-                        if year and month:
-                            labels.append(f"{int(year)}-{int(month):02d}")
-                        else:
-                            first_val = row.iloc[0]
-                            labels.append(str(first_val) if first_val is not None else "Unknown")  # Fallback
+                if month_cols and 'year' in cols_lower_set:
+                    # Create month-year labels from the last year-like and month-like columns,
+                    # falling back to the first column
+                    year_col = year_cols[-1]
+                    month_part_col = next((col for col in reversed(month_cols) if col not in year_cols), None)
+                    if month_part_col:
+                        labels = _year_month_labels(df[year_col], df[month_part_col], df.iloc[:, 0])
+                    else:
+                        labels = _labels_from(df.iloc[:, 0])
                 else:
                     # Use the first non-value column as labels
-                    label_col = [col for col in df.columns if col != value_col][0] if len(df.columns) > 1 else df.columns[0]
-                    labels = [str(x) if x is not None else "Unknown" for x in df[label_col].astype(str).tolist()]
+                    label_col = next((col for col in df.columns if col != value_col), df.columns[0])
+                    labels = _str_labels(df[label_col])
                 
                 return {
                     "type": "column",
@@ -913,10 +1304,7 @@ class ExecuteSQL(Node):
                         "borderColor": 'rgba(66, 185, 130, 1)',
                         "borderWidth": 2
                     }],
-                    "options": {
-                        "responsive": True,
-                        "maintainAspectRatio": False
-                    }
+                    "options": _DEFAULT_OPTIONS
                 }
             
             is_stackable = len(filtered_numeric_cols) >= 2 and len(df) >= 2
@@ -928,9 +1316,7 @@ class ExecuteSQL(Node):
                 # the data can be split for comparison (e.g., billable vs non-billable)
                 
                 # Check if column names or query text suggests categories that should be split
-                comparison_keywords_in_query = ['billable.*non.?billable', 'vs', 'versus', 'comparing.*']
-                import re
-                has_comparison_pattern = any(re.search(pattern, query_text.lower()) for pattern in comparison_keywords_in_query)
+                has_comparison_pattern = bool(_COMPARISON_HINT_PAT.search(query_text))
                 
                 if has_comparison_pattern:
                     # Add a note to the chart title indicating limitation
@@ -940,8 +1326,8 @@ class ExecuteSQL(Node):
                     if len(filtered_numeric_cols) == 1 and len(non_numeric_cols) >= 1:
                         label_col = non_numeric_cols[0]
                         value_col = filtered_numeric_cols[0]
-                        labels = [str(x) if x is not None else "Unknown" for x in df[label_col].tolist()]
-                        data = df[value_col].tolist()
+                        labels = _labels_from(df[label_col])
+                        data = _data_from(df[value_col])
                         
                         chart_type = primary_chart_type or "column"
                         
@@ -956,10 +1342,7 @@ class ExecuteSQL(Node):
                                 "borderColor": 'rgba(66, 185, 130, 1)',
                                 "borderWidth": 2
                             }],
-                            "options": {
-                                "responsive": True,
-                                "maintainAspectRatio": False
-                            }
+                            "options": _DEFAULT_OPTIONS
                         }
             
             # If user requested comparison and we have multiple numeric columns, prefer multi-series
@@ -983,47 +1366,25 @@ class ExecuteSQL(Node):
                     chart_type = "stackedColumn"
             
             # Create a multi-series chart using only actual value columns
-            datasets = []
             # Use colors from config.js palette
-            config_colors = [
-                'rgba(254, 99, 131, 0.7)',   # #fe6383
-                'rgba(202, 203, 206, 0.7)',  # #cacbce
-                'rgba(153, 102, 255, 0.7)',  # #9966ff
-                'rgba(54, 162, 235, 0.7)',   # #36a2eb
-                'rgba(255, 204, 85, 0.7)',   # #ffcc55
-                'rgba(76, 192, 192, 0.7)',   # #4ac0c0
-                'rgba(255, 159, 64, 0.7)',   # #ff9f40
-                'rgba(66, 185, 130, 0.7)'    # #42b982
-            ]
+            palette = _SERIES_PALETTE
             
             # For comparison queries with 2 series, use highly contrasting colors from config
             if is_comparison_query and len(filtered_numeric_cols) == 2:
-                config_colors = [
-                    'rgba(254, 99, 131, 0.8)',   # Pink/Red for first series (#fe6383)
-                    'rgba(54, 162, 235, 0.8)'    # Blue for second series (#36a2eb)
-                ]
+                palette = _COMPARISON_PALETTE[:2]
             elif is_comparison_query and len(filtered_numeric_cols) >= 3:
                 # For multi-series comparison, use highly distinct colors
-                config_colors = [
-                    'rgba(254, 99, 131, 0.8)',   # Pink/Red (#fe6383)
-                    'rgba(54, 162, 235, 0.8)',   # Blue (#36a2eb)
-                    'rgba(76, 192, 192, 0.8)',   # Teal (#4ac0c0)
-                    'rgba(255, 159, 64, 0.8)',   # Orange (#ff9f40)
-                    'rgba(153, 102, 255, 0.8)',  # Purple (#9966ff)
-                    'rgba(255, 204, 85, 0.8)',   # Yellow (#ffcc55)
-                    'rgba(66, 185, 130, 0.8)',   # Green (#42b982)
-                    'rgba(202, 203, 206, 0.8)'   # Gray (#cacbce)
-                ]
-            
-            for i, col in enumerate(filtered_numeric_cols[:5]):  # Use filtered columns only
-                color = config_colors[i % len(config_colors)]
-                datasets.append({
-                    "label": format_title_text(col),  # Use formatted column names
-                    "data": df[col].tolist(),
-                    "backgroundColor": color,
-                    "borderColor": color.replace('0.7', '1').replace('0.8', '1'),
-                    "borderWidth": 1
-                })
+                palette = _COMPARISON_PALETTE
+            
+            series_cols = filtered_numeric_cols[:5]  # Use filtered columns only
+            series_data = _columns_data_from(df, series_cols)
+            datasets = [{
+                "label": format_title_text(col),  # Use formatted column names
+                "data": data,
+                "backgroundColor": fill,
+                "borderColor": border,
+                "borderWidth": 1
+            } for col, data, (fill, border) in zip(series_cols, series_data, cycle(palette))]
             
             # Create better title for comparison queries
             if is_comparison_query and len(filtered_numeric_cols) >= 2:
@@ -1037,10 +1398,7 @@ class ExecuteSQL(Node):
                 "title": title,
                 "labels": labels,
                 "datasets": datasets,
-                "options": {
-                    "responsive": True,
-                    "maintainAspectRatio": False
-                }
+                "options": _DEFAULT_OPTIONS
             }
         
         return None
@@ -1050,134 +1408,36 @@ class ExecuteSQL(Node):
         Detect chart type from keywords in the query text, with fallbacks to core chart types
         Returns a tuple: (primary_chart_type, secondary_chart_type)
         Only includes chart types that are enabled in config.js
+        Expects an already-lowercased query.
         """
-        # Enhanced chart type keywords mapping with primary and secondary chart types
-        # Only including charts that are enabled in config.js (marked as true)
-        chart_keywords = {
-            # Core supported charts (enabled in config.js)
-            'pie': {
-                'keywords': ['pie', 'pie chart', 'semi pie', 'half pie', 'semi pie chart', 'half pie chart'],
-                'secondary': 'doughnut'
-            },
-            'column': {
-                'keywords': ['column', 'column chart', 'vertical bar', 'vertical bars'],
-                'secondary': 'bar'
-            },
-            'bar': {
-                'keywords': ['bar', 'bar chart', 'horizontal bar', 'horizontal bars'],
-                'secondary': 'column'
-            },
-            'line': {
-                'keywords': ['line', 'line chart', 'trend line', 'trend chart'],
-                'secondary': 'area'
-            },
-            'area': {
-                'keywords': ['area', 'area chart', 'filled line'],
-                'secondary': 'line'
-            },
-            'doughnut': {
-                'keywords': ['ring', 'ring chart', 'semi ring', 'half ring', 'semi ring chart', 'half ring chart', 'doughnut', 'donut'],
-                'secondary': 'pie'
-            },
-            'scatter': {
-                'keywords': ['scatter', 'scatter plot', 'scatter chart', 'dot plot'],
-                'secondary': 'line'
-            },
-            'stackedColumn': {
-                'keywords': ['stacked column', 'stacked', 'stacked bar', 'layered'],
-                'secondary': 'column'
-            },
-            # Advanced charts that are enabled in config.js
-            'combo': {
-                'keywords': ['combo chart', 'combination chart', 'mixed chart'],
-                'secondary': 'column'
-            },
-            'kpi': {
-                'keywords': ['kpi', 'metric', 'single value', 'key performance', 'indicator'],
-                'secondary': 'column'
-            }
-            # Note: Disabled charts from config.js are not included:
-            # - spline, bubble, stacked, stackedBar, radar, polar, funnel, pyramid, heatmap, boxplot, waterfall
-            # - map_scatter, map_bubble, map_pie, map_bubble_pie, pivot, web
-        }
-        
-        # Look for chart type keywords in the query
-        for chart_type, chart_info in chart_keywords.items():
-            for keyword in chart_info['keywords']:
-                if keyword in query_text:
-                    primary_type = chart_type
-                    secondary_type = chart_info['secondary']
-                    return (primary_type, secondary_type)
+        # Look for chart type keywords in the query, in chart type priority order
+        for keyword, primary_type, secondary_type in _CHART_KEYWORD_SCAN:
+            if keyword in query_text:
+                return (primary_type, secondary_type)
         
         return (None, None)
     
     def _detect_comparison_intent(self, query_text):
         """
         Detect if the user wants to compare multiple categories or series
+        Expects an already-lowercased query.
         """
-        comparison_keywords = [
-            'compare', 'comparing', 'comparison', 'vs', 'versus', 'against',
-            'difference', 'differences', 'between', 'and', 'contrast',
-            'side by side', 'side-by-side', 'breakdown by', 'split by',
-            'grouped by', 'segmented by', 'categorized by', 'separated by'
-        ]
-        
-        # Check for explicit comparison keywords
-        for keyword in comparison_keywords:
+        # Check for explicit comparison keywords (this also covers " vs " and " versus ").
+        # Phrasings like "billable vs non-billable" or "P3 New and P3 Rerun" always contain
+        # one of these keywords, so they need no separate regex pass.
+        for keyword in _COMPARISON_KEYWORDS:
             if keyword in query_text:
                 return True
         
-        # Check for pattern like "A vs B", "A and B", "A versus B"
-        if ' vs ' in query_text or ' versus ' in query_text:
-            return True
-            
-        # Check for specific comparison patterns like "billable vs non-billable"
-        import re
-        billable_pattern = r'billable\s+(vs|versus|and)\s+non.?billable'
-        if re.search(billable_pattern, query_text, re.IGNORECASE):
-            return True
-        
-        # Check for other common comparison patterns
-        common_comparisons = [
-            r'active\s+(vs|versus|and)\s+inactive',
-            r'completed\s+(vs|versus|and)\s+pending',
-            r'new\s+(vs|versus|and)\s+(old|existing)',
-            r'internal\s+(vs|versus|and)\s+external'
-        ]
-        
-        for pattern in common_comparisons:
-            if re.search(pattern, query_text, re.IGNORECASE):
-                return True
-            
-        # Check for " and " pattern but avoid common non-comparison uses
-        if ' and ' in query_text:
-            # Look for patterns like "X and Y" where X and Y are likely categories
-            # Match patterns like "P3 New and P3 Rerun", "Category A and Category B"
-            and_pattern = r'\b[A-Z][A-Za-z0-9]*\s+[A-Z][A-Za-z0-9]*\s+and\s+[A-Z][A-Za-z0-9]*\s+[A-Z][A-Za-z0-9]*\b'
-            if re.search(and_pattern, query_text.title()):
-                return True
-        
-        # Check for multiple category mentions (like "P3 New" and "P3 Rerun")
-        # Look for patterns with spaces and capital letters that suggest categories
-        # Enhanced pattern to catch things like "P3 New", "P3 Rerun", "Category A", etc.
-        category_pattern = r'\b[A-Z][A-Za-z0-9]*\s+[A-Z][A-Za-z0-9]*\b'
-        categories_found = re.findall(category_pattern, query_text.title())
-        
-        # Filter out common non-category phrases
-        filtered_categories = []
-        exclude_phrases = ['Job Count', 'Data Table', 'Chart Type', 'By Month', 'Per Month', 'Each Month']
-        
-        for cat in categories_found:
-            if cat not in exclude_phrases:
-                filtered_categories.append(cat)
-        
-        if len(filtered_categories) >= 2:
-            return True
-        
-        # Check for patterns like "X vs Y jobs", "X versus Y adapter"
-        vs_pattern = r'\b[A-Za-z0-9]+\s+(vs|versus)\s+[A-Za-z0-9]+\b'
-        if re.search(vs_pattern, query_text, re.IGNORECASE):
-            return True
+        # Check for multiple category mentions (like "P3 New" and "P3 Rerun"),
+        # stopping as soon as a second one is found
+        categories_found = 0
+        for match in _CATEGORY_PAT.finditer(query_text.title()):
+            # Skip common non-category phrases
+            if match.group() not in _NON_CATEGORY_PHRASES:
+                categories_found += 1
+                if categories_found >= 2:
+                    return True
             
         return False
     
@@ -1192,22 +1452,18 @@ class ExecuteSQL(Node):
             "title": format_title_text(metric_col),
             "value": value,
             "format": "number" if isinstance(value, (int, float)) else "text",
-            "options": {
-                "responsive": True,
-                "maintainAspectRatio": False
-            }
+            "options": _DEFAULT_OPTIONS
         }
     
     def _detect_geo_chart(self, df, non_numeric_cols, query_text):
         """
         Detect if data contains geographical information for map charts
+        Expects an already-lowercased query.
         """
-        # Common geographical column indicators
-        geo_indicators = ['state', 'country', 'region', 'city', 'location', 'area', 'territory', 'zone']
-        
         geo_cols = []
         for col in non_numeric_cols:
-            if any(indicator in col.lower() for indicator in geo_indicators):
+            col_lower = col.lower()
+            if any(indicator in col_lower for indicator in _GEO_INDICATORS):
                 geo_cols.append(col)
         
         if not geo_cols:
@@ -1232,16 +1488,13 @@ class ExecuteSQL(Node):
         return {
             "type": "map_scatter",
             "title": f"Distribution by {format_title_text(geo_col)}",
-            "labels": [str(x) if x is not None else "Unknown" for x in df[geo_col].tolist()],
+            "labels": _labels_from(df[geo_col]),
             "datasets": [{
                 "label": "Locations",
                 "data": [1] * len(df),  # Equal size points
                 "backgroundColor": '#1aaa55'
             }],
-            "options": {
-                "responsive": True,
-                "maintainAspectRatio": False
-            }
+            "options": _DEFAULT_OPTIONS
         }
     
     def _create_map_bubble_chart(self, df, geo_col, value_col):
@@ -1249,56 +1502,52 @@ class ExecuteSQL(Node):
         return {
             "type": "map_bubble",
             "title": f"{format_title_text(value_col)} by {format_title_text(geo_col)}",
-            "labels": [str(x) if x is not None else "Unknown" for x in df[geo_col].tolist()],
+            "labels": _labels_from(df[geo_col]),
             "datasets": [{
                 "label": format_title_text(value_col),
                 "data": df[value_col].tolist(),
                 "backgroundColor": '#357cd2'
             }],
-            "options": {
-                "responsive": True,
-                "maintainAspectRatio": False
-            }
+            "options": _DEFAULT_OPTIONS
         }
     
     def _create_map_pie_chart(self, df, geo_col, numeric_cols):
         """Create a map pie chart"""
+        series_cols = numeric_cols[:5]
+        series_data = _columns_data_from(df, series_cols)
         return {
             "type": "map_pie",
             "title": f"Multi-metric comparison by {format_title_text(geo_col)}",
-            "labels": [str(x) if x is not None else "Unknown" for x in df[geo_col].tolist()],
+            "labels": _labels_from(df[geo_col]),
             "datasets": [{
                 "label": format_title_text(col),
-                "data": df[col].tolist()
-            } for i, col in enumerate(numeric_cols[:5])],
-            "options": {
-                "responsive": True,
-                "maintainAspectRatio": False
-            }
+                "data": data
+            } for col, data in zip(series_cols, series_data)],
+            "options": _DEFAULT_OPTIONS
         }
     
     def _create_map_bubble_pie_chart(self, df, geo_col, numeric_cols):
         """Create a map bubble pie chart"""
+        series_cols = numeric_cols[:5]
+        series_data = _columns_data_from(df, series_cols)
         return {
             "type": "map_bubble_pie",
             "title": f"Proportional analysis by {format_title_text(geo_col)}",
-            "labels": [str(x) if x is not None else "Unknown" for x in df[geo_col].tolist()],
+            "labels": _labels_from(df[geo_col]),
             "datasets": [{
                 "label": format_title_text(col),
-                "data": df[col].tolist()
-            } for i, col in enumerate(numeric_cols[:5])],
-            "options": {
-                "responsive": True,
-                "maintainAspectRatio": False
-            }
+                "data": data
+            } for col, data in zip(series_cols, series_data)],
+            "options": _DEFAULT_OPTIONS
         }
     
     def _determine_optimal_chart_type(self, data, labels):
         """
         Determine the optimal chart type based on data characteristics, similar to Zoho Ask Zia logic
         """
-        # Check if data represents a sequential process (suitable for bar chart)
-        if sorted(data, reverse=True) == data and len(set(data)) == len(data) and len(labels) <= 10:
+        # Check if data represents a sequential process (suitable for bar chart):
+        # strictly decreasing values, i.e. sorted descending with no duplicates
+        if len(labels) <= 10 and all(prev > cur for prev, cur in zip(data, data[1:])):
             return "bar"  # Use bar chart for sequential/ordered data
         
         # For few categories with significant differences, pie chart is better
@@ -1320,40 +1569,40 @@ class ExecuteSQL(Node):
         """
         Create chart based on detected keywords, using core chart types only
         """
-        if len(numeric_cols) == 0:
+        # Bail out before building labels when the builder could not use the data;
+        # None lets the caller fall back to the secondary chart type
+        if len(numeric_cols) < _MIN_NUMERIC_COLUMNS.get(chart_type, 1):
             return None
         
         # Get labels and data
         if len(non_numeric_cols) > 0:
-            labels = [str(x) if x is not None else "Unknown" for x in df[non_numeric_cols[0]].tolist()]
+            labels = _labels_from(df[non_numeric_cols[0]])
         else:
-            labels = [str(x) if x is not None else "Unknown" for x in df.index.tolist()]
-        
-        # Use intelligent column selection for single-column charts
-        primary_numeric_col = self._select_primary_value_column(df, numeric_cols, query_text)
+            labels = _labels_from(df.index)
         
         # Handle different chart types based on keywords
-        # Only core supported chart types that are enabled in config.js
+        # Only core supported chart types that are enabled in config.js.
+        # Single-column charts use intelligent column selection, run only in their branches
         if chart_type == 'stackedColumn':
             return self._create_stacked_chart(df, labels, numeric_cols, 'stackedColumn')
         elif chart_type == 'pie':
-            return self._create_pie_chart(df, labels, primary_numeric_col)
+            return self._create_pie_chart(df, labels, self._select_primary_value_column(df, numeric_cols, query_text))
         elif chart_type == 'column':
             return self._create_column_chart(df, labels, numeric_cols, is_comparison, query_text)
         elif chart_type == 'bar':
             return self._create_bar_chart(df, labels, numeric_cols, is_comparison, query_text)
         elif chart_type == 'line':
-            return self._create_line_chart(df, labels, primary_numeric_col)
+            return self._create_line_chart(df, labels, self._select_primary_value_column(df, numeric_cols, query_text))
         elif chart_type == 'doughnut':
-            return self._create_doughnut_chart(df, labels, primary_numeric_col)
+            return self._create_doughnut_chart(df, labels, self._select_primary_value_column(df, numeric_cols, query_text))
         elif chart_type == 'scatter':
             return self._create_scatter_chart(df, labels, numeric_cols)
         elif chart_type == 'combo':
             return self._create_combo_chart(df, labels, numeric_cols)
         elif chart_type == 'area':
-            return self._create_area_chart(df, labels, primary_numeric_col)
+            return self._create_area_chart(df, labels, self._select_primary_value_column(df, numeric_cols, query_text))
         elif chart_type == 'kpi':
-            return self._create_kpi_widget(df, primary_numeric_col)
+            return self._create_kpi_widget(df, self._select_primary_value_column(df, numeric_cols, query_text))
         
         # Default fallback for any other unsupported types
         else:
@@ -1361,28 +1610,15 @@ class ExecuteSQL(Node):
     
     def _create_stacked_chart(self, df, labels, numeric_cols, chart_type, colors=None):
         """Create stacked column chart (simplified from stacked bar/column)"""
-        # Use colors from config.js palette
-        config_colors = [
-            'rgba(254, 99, 131, 0.8)',   # #fe6383
-            'rgba(202, 203, 206, 0.8)',  # #cacbce
-            'rgba(153, 102, 255, 0.8)',  # #9966ff
-            'rgba(54, 162, 235, 0.8)',   # #36a2eb
-            'rgba(255, 204, 85, 0.8)',   # #ffcc55
-            'rgba(76, 192, 192, 0.8)',   # #4ac0c0
-            'rgba(255, 159, 64, 0.8)',   # #ff9f40
-            'rgba(66, 185, 130, 0.8)'    # #42b982
-        ]
-        
-        datasets = []
-        for i, col in enumerate(numeric_cols[:5]):
-            color = config_colors[i % len(config_colors)]
-            datasets.append({
-                "label": format_title_text(col),
-                "data": df[col].tolist(),
-                "backgroundColor": color,
-                "borderColor": color.replace('0.8', '1'),
-                "borderWidth": 1
-            })
+        series_cols = numeric_cols[:5]
+        series_data = _columns_data_from(df, series_cols)
+        datasets = [{
+            "label": format_title_text(col),
+            "data": data,
+            "backgroundColor": background,
+            "borderColor": border,
+            "borderWidth": 1
+        } for col, data, (background, border) in zip(series_cols, series_data, cycle(_CONFIG_COLOR_PAIRS))]
         
         return {
             "type": chart_type,
@@ -1390,8 +1626,7 @@ class ExecuteSQL(Node):
             "labels": labels,
             "datasets": datasets,
             "options": {
-                "responsive": True,
-                "maintainAspectRatio": False,
+                **_DEFAULT_OPTIONS,
                 "scales": {
                     "x": {"stacked": True},
                     "y": {"stacked": True}
@@ -1411,10 +1646,7 @@ class ExecuteSQL(Node):
                 "borderColor": '#ffffff',
                 "borderWidth": 2
             }],
-            "options": {
-                "responsive": True,
-                "maintainAspectRatio": False
-            }
+            "options": _DEFAULT_OPTIONS
         }
     
     def _create_ring_chart(self, df, labels, numeric_col, colors=None):
@@ -1429,10 +1661,7 @@ class ExecuteSQL(Node):
                 "borderColor": '#ffffff',
                 "borderWidth": 2
             }],
-            "options": {
-                "responsive": True,
-                "maintainAspectRatio": False
-            }
+            "options": _DEFAULT_OPTIONS
         }
     
     def _create_doughnut_chart(self, df, labels, numeric_col, colors=None):
@@ -1455,22 +1684,14 @@ class ExecuteSQL(Node):
                     "data": df[numeric_cols[0]].tolist(),
                     "pointRadius": 5
                 }],
-                "options": {
-                    "responsive": True,
-                    "maintainAspectRatio": False
-                }
+                "options": _DEFAULT_OPTIONS
             }
         
         # For multiple columns, use first two as x and y
         x_col = numeric_cols[0]
         y_col = numeric_cols[1]
         
-        scatter_data = []
-        for i in range(len(df)):
-            scatter_data.append({
-                "x": df[x_col].iloc[i],
-                "y": df[y_col].iloc[i]
-            })
+        scatter_data = [{"x": x, "y": y} for x, y in zip(_data_from(df[x_col]), _data_from(df[y_col]))]
         
         return {
             "type": "scatter",
@@ -1481,26 +1702,11 @@ class ExecuteSQL(Node):
                 "data": scatter_data,
                 "pointRadius": 5
             }],
-            "options": {
-                "responsive": True,
-                "maintainAspectRatio": False
-            }
+            "options": _DEFAULT_OPTIONS
         }
     
     def _create_bar_chart(self, df, labels, numeric_cols, is_comparison=False, query_text=""):
         """Create basic bar chart - supports multi-series for comparisons"""
-        # Use colors from config.js palette
-        config_colors = [
-            'rgba(254, 99, 131, 0.8)',   # #fe6383
-            'rgba(202, 203, 206, 0.8)',  # #cacbce
-            'rgba(153, 102, 255, 0.8)',  # #9966ff
-            'rgba(54, 162, 235, 0.8)',   # #36a2eb
-            'rgba(255, 204, 85, 0.8)',   # #ffcc55
-            'rgba(76, 192, 192, 0.8)',   # #4ac0c0
-            'rgba(255, 159, 64, 0.8)',   # #ff9f40
-            'rgba(66, 185, 130, 0.8)'    # #42b982
-        ]
-        
         # If comparison and multiple numeric columns, create multi-series with smart selection
         if is_comparison and isinstance(numeric_cols, list) and len(numeric_cols) > 1:
             # Use intelligent column selection to avoid irrelevant metrics
@@ -1508,21 +1714,22 @@ class ExecuteSQL(Node):
             if smart_cols:
                 numeric_cols = smart_cols
                 
-            datasets = []
+            series_cols = numeric_cols[:5]  # Limit to 5 series
+            series_data = _columns_data_from(df, series_cols)
+            # Series labels double as the comparison title parts
+            series_labels = [format_title_text(col) for col in series_cols]
             
-            for i, col in enumerate(numeric_cols[:5]):  # Limit to 5 series
-                color = config_colors[i % len(config_colors)]
-                datasets.append({
-                    "label": format_title_text(col),
-                    "data": df[col].tolist(),
-                    "backgroundColor": color,
-                    "borderColor": color.replace('0.8', '1'),
-                    "borderWidth": 1
-                })
+            datasets = [{
+                "label": label,
+                "data": data,
+                "backgroundColor": background,
+                "borderColor": border,
+                "borderWidth": 1
+            } for label, data, (background, border) in zip(series_labels, series_data, cycle(_CONFIG_COLOR_PAIRS))]
             
             # Create better title for comparison
             if len(numeric_cols) == 2:
-                title = f"{format_title_text(numeric_cols[0])} vs {format_title_text(numeric_cols[1])}"
+                title = f"{series_labels[0]} vs {series_labels[1]}"
             else:
                 title = f"Comparison of {len(numeric_cols)} metrics"
         else:
@@ -1531,8 +1738,8 @@ class ExecuteSQL(Node):
             datasets = [{
                 "label": format_title_text(numeric_col),
                 "data": df[numeric_col].tolist(),
-                "backgroundColor": config_colors[0],  # Use first config color
-                "borderColor": config_colors[0].replace('0.8', '1'),
+                "backgroundColor": _CONFIG_COLOR_PAIRS[0][0],  # Use first config color
+                "borderColor": _CONFIG_COLOR_PAIRS[0][1],
                 "borderWidth": 2
             }]
             title = f"{format_title_text(numeric_col)} by category"
@@ -1542,10 +1749,7 @@ class ExecuteSQL(Node):
             "title": title,
             "labels": labels,
             "datasets": datasets,
-            "options": {
-                "responsive": True,
-                "maintainAspectRatio": False
-            }
+            "options": _DEFAULT_OPTIONS
         }
     
     def _create_bubble_chart(self, df, labels, numeric_cols, colors):
@@ -1558,13 +1762,11 @@ class ExecuteSQL(Node):
         y_col = numeric_cols[1]
         size_col = numeric_cols[2] if len(numeric_cols) > 2 else y_col
         
-        bubble_data = []
-        for i, label in enumerate(labels):
-            bubble_data.append({
-                "x": df[x_col].iloc[i],
-                "y": df[y_col].iloc[i],
-                "r": max(5, df[size_col].iloc[i] * 0.1)  # Scale bubble size
-            })
+        bubble_data = [{
+            "x": x,
+            "y": y,
+            "r": max(5, size * 0.1)  # Scale bubble size
+        } for _, x, y, size in zip(labels, _data_from(df[x_col]), _data_from(df[y_col]), _data_from(df[size_col]))]
         
         return {
             "type": "bubble",
@@ -1577,10 +1779,7 @@ class ExecuteSQL(Node):
                 "borderColor": '#ffffff',
                 "borderWidth": 1
             }],
-            "options": {
-                "responsive": True,
-                "maintainAspectRatio": False
-            }
+            "options": _DEFAULT_OPTIONS
         }
     
     def _create_bubble_pie_chart(self, df, labels, numeric_cols, colors):
@@ -1593,19 +1792,19 @@ class ExecuteSQL(Node):
             return None
         
         # Use colors from config.js palette
-        config_colors = [
-            'rgba(254, 99, 131, 0.8)',   # #fe6383
-            'rgba(76, 192, 192, 0.8)',   # #4ac0c0
-        ]
+        bar_background, bar_border = _CONFIG_COLOR_PAIRS[0]     # #fe6383
+        line_background, line_border = _CONFIG_COLOR_PAIRS[5]   # #4ac0c0
+        
+        bar_data, line_data = _columns_data_from(df, numeric_cols[:2])
         
         datasets = []
         # First series as bar
         datasets.append({
             "type": "bar",
             "label": format_title_text(numeric_cols[0]),
-            "data": df[numeric_cols[0]].tolist(),
-            "backgroundColor": config_colors[0],
-            "borderColor": config_colors[0].replace('0.8', '1'),
+            "data": bar_data,
+            "backgroundColor": bar_background,
+            "borderColor": bar_border,
             "borderWidth": 1
         })
         
@@ -1613,9 +1812,9 @@ class ExecuteSQL(Node):
         datasets.append({
             "type": "line",
             "label": format_title_text(numeric_cols[1]),
-            "data": df[numeric_cols[1]].tolist(),
-            "borderColor": config_colors[1].replace('0.8', '1'),
-            "backgroundColor": config_colors[1],
+            "data": line_data,
+            "borderColor": line_border,
+            "backgroundColor": line_background,
             "borderWidth": 2,
             "fill": False
         })
@@ -1625,16 +1824,13 @@ class ExecuteSQL(Node):
             "title": "Combination chart",
             "labels": labels,
             "datasets": datasets,
-            "options": {
-                "responsive": True,
-                "maintainAspectRatio": False
-            }
+            "options": _DEFAULT_OPTIONS
         }
     
     def _create_area_chart(self, df, labels, numeric_col, colors=None):
         """Create area chart"""
         # Use config color
-        config_color = 'rgba(153, 102, 255, 0.8)'  # #9966ff from config
+        background, border = _CONFIG_COLOR_PAIRS[2]  # #9966ff from config
         
         return {
             "type": "area",
@@ -1643,15 +1839,12 @@ class ExecuteSQL(Node):
             "datasets": [{
                 "label": format_title_text(numeric_col),
                 "data": df[numeric_col].tolist(),
-                "backgroundColor": config_color,
-                "borderColor": config_color.replace('0.8', '1'),
+                "backgroundColor": background,
+                "borderColor": border,
                 "borderWidth": 2,
                 "fill": True
             }],
-            "options": {
-                "responsive": True,
-                "maintainAspectRatio": False
-            }
+            "options": _DEFAULT_OPTIONS
         }
     
     def _create_funnel_chart(self, df, labels, numeric_col, colors):
@@ -1667,19 +1860,18 @@ class ExecuteSQL(Node):
                 "borderColor": '#ffffff',
                 "borderWidth": 2
             }],
-            "options": {
-                "responsive": True,
-                "maintainAspectRatio": False
-            }
+            "options": _DEFAULT_OPTIONS
         }
     
     def _create_web_chart(self, df, labels, numeric_cols, colors):
         """Create web (radar) chart"""
         datasets = []
-        for i, col in enumerate(numeric_cols[:3]):  # Limit to 3 series for readability
+        series_cols = numeric_cols[:3]  # Limit to 3 series for readability
+        series_data = _columns_data_from(df, series_cols)
+        for i, col in enumerate(series_cols):
             datasets.append({
                 "label": col,
-                "data": df[col].tolist(),
+                "data": series_data[i],
                 "backgroundColor": colors[i] + '40',  # Add transparency
                 "borderColor": colors[i],
                 "borderWidth": 2
@@ -1690,17 +1882,15 @@ class ExecuteSQL(Node):
             "title": "Web comparison",
             "labels": labels,
             "datasets": datasets,
-            "options": {
-                "responsive": True,
-                "maintainAspectRatio": False
-            }
+            "options": _DEFAULT_OPTIONS
         }
     
     def _create_pivot_view(self, df, numeric_cols, non_numeric_cols):
         """Create pivot table view"""
-        # Format column names for better display in pivot tables
-        formatted_columns = {col: format_title_text(col) for col in df.columns}
-        df_formatted = df.rename(columns=formatted_columns)
+        # Format column names for better display in pivot tables; records are zipped straight
+        # from plain row tuples so no renamed copy of the DataFrame is materialized
+        formatted_columns = [format_title_text(col) for col in df.columns]
+        records = [dict(zip(formatted_columns, row)) for row in df.itertuples(index=False, name=None)]
         
         # Also format the column lists
         formatted_numeric_cols = [format_title_text(col) for col in numeric_cols]
@@ -1709,29 +1899,14 @@ class ExecuteSQL(Node):
         return {
             "type": "pivot",
             "title": "Pivot analysis",
-            "data": df_formatted.to_dict(orient="records"),
+            "data": records,
             "numeric_columns": formatted_numeric_cols,
             "categorical_columns": formatted_categorical_cols,
-            "options": {
-                "responsive": True,
-                "maintainAspectRatio": False
-            }
+            "options": _DEFAULT_OPTIONS
         }
     
     def _create_column_chart(self, df, labels, numeric_cols, is_comparison=False, query_text=""):
         """Create column chart (vertical bars) - supports multi-series for comparisons"""
-        # Use colors from config.js palette
-        config_colors = [
-            'rgba(254, 99, 131, 0.8)',   # #fe6383
-            'rgba(202, 203, 206, 0.8)',  # #cacbce
-            'rgba(153, 102, 255, 0.8)',  # #9966ff
-            'rgba(54, 162, 235, 0.8)',   # #36a2eb
-            'rgba(255, 204, 85, 0.8)',   # #ffcc55
-            'rgba(76, 192, 192, 0.8)',   # #4ac0c0
-            'rgba(255, 159, 64, 0.8)',   # #ff9f40
-            'rgba(66, 185, 130, 0.8)'    # #42b982
-        ]
-        
         # If comparison and multiple numeric columns, create multi-series with smart selection
         if is_comparison and len(numeric_cols) > 1:
             # Use intelligent column selection to avoid irrelevant metrics
@@ -1739,21 +1914,22 @@ class ExecuteSQL(Node):
             if smart_cols:
                 numeric_cols = smart_cols
             
-            datasets = []
+            series_cols = numeric_cols[:5]  # Limit to 5 series
+            series_data = _columns_data_from(df, series_cols)
+            # Series labels double as the comparison title parts
+            series_labels = [format_title_text(col) for col in series_cols]
             
-            for i, col in enumerate(numeric_cols[:5]):  # Limit to 5 series
-                color = config_colors[i % len(config_colors)]
-                datasets.append({
-                    "label": format_title_text(col),
-                    "data": df[col].tolist(),
-                    "backgroundColor": color,
-                    "borderColor": color.replace('0.8', '1'),
-                    "borderWidth": 1
-                })
+            datasets = [{
+                "label": label,
+                "data": data,
+                "backgroundColor": background,
+                "borderColor": border,
+                "borderWidth": 1
+            } for label, data, (background, border) in zip(series_labels, series_data, cycle(_CONFIG_COLOR_PAIRS))]
             
             # Create better title for comparison
             if len(numeric_cols) == 2:
-                title = f"{format_title_text(numeric_cols[0])} vs {format_title_text(numeric_cols[1])}"
+                title = f"{series_labels[0]} vs {series_labels[1]}"
             else:
                 title = f"Comparison of {len(numeric_cols)} metrics"
         else:
@@ -1762,8 +1938,8 @@ class ExecuteSQL(Node):
             datasets = [{
                 "label": format_title_text(numeric_col),
                 "data": df[numeric_col].tolist(),
-                "backgroundColor": config_colors[0],  # Use first config color
-                "borderColor": config_colors[0].replace('0.8', '1'),
+                "backgroundColor": _CONFIG_COLOR_PAIRS[0][0],  # Use first config color
+                "borderColor": _CONFIG_COLOR_PAIRS[0][1],
                 "borderWidth": 2
             }]
             title = f"{format_title_text(numeric_col)} by categories"
@@ -1773,16 +1949,13 @@ class ExecuteSQL(Node):
             "title": title,
             "labels": labels,
             "datasets": datasets,
-            "options": {
-                "responsive": True,
-                "maintainAspectRatio": False
-            }
+            "options": _DEFAULT_OPTIONS
         }
     
     def _create_line_chart(self, df, labels, numeric_col, colors=None):
         """Create line chart"""
         # Use first color from config.js palette
-        config_color = 'rgba(76, 192, 192, 0.8)'  # #4ac0c0 from config
+        background, border = _CONFIG_COLOR_PAIRS[5]  # #4ac0c0 from config
         
         return {
             "type": "line",
@@ -1791,15 +1964,12 @@ class ExecuteSQL(Node):
             "datasets": [{
                 "label": format_title_text(numeric_col),
                 "data": df[numeric_col].tolist(),
-                "borderColor": config_color.replace('0.8', '1'),
-                "backgroundColor": config_color,
+                "borderColor": border,
+                "backgroundColor": background,
                 "borderWidth": 2,
                 "fill": False
             }],
-            "options": {
-                "responsive": True,
-                "maintainAspectRatio": False
-            }
+            "options": _DEFAULT_OPTIONS
         }
     
     def post(self, shared, prep_res, exec_res):
@@ -1822,42 +1992,42 @@ class ExecuteSQL(Node):
 class GenerateInsights(Node):
     """Node to generate insights and follow-up questions for chart data"""
     
-    def _sanitize_followups(self, followups, db_name):
+    def _sanitize_followups(self, followups, view_info):
         """
         Replace raw database column names in follow-up questions with
         user-friendly labels (title-cased with spaces) to avoid leakage.
+        Column names come from the view info fetched once in prep.
         """
         try:
             if not followups:
                 return followups
-            view_info = get_job_details_view_info(db_name=db_name) or {}
-            columns = view_info.get("columns", []) if isinstance(view_info, dict) else []
+            columns = view_info["columns"]
             if not columns:
                 return followups
-            # Sort by length to avoid partial replacements (e.g., Job vs JobId)
-            columns_sorted = sorted(columns, key=len, reverse=True)
-            import re as _re
+            # One alternation compiled per column set replaces every column name in a single pass
+            column_pattern, column_labels = _column_label_patterns(tuple(columns))
+            
+            def _column_label(m):
+                return column_labels[m.group().lower()]
+            
+            def _strip_quotes_inside_parens(m):
+                inner = _QUOTED_PAT.sub(r"\1", m.group(1))
+                return f"({inner})"
+            
             sanitized = []
             for q in followups:
                 new_q = str(q)
                 # Remove markdown/code styling backticks for cleaner UX
                 if '`' in new_q:
                     new_q = new_q.replace('`', '')
-                for col in columns_sorted:
-                    label = format_title_text(col)
-                    pattern = _re.compile(rf"\b{_re.escape(col)}\b", _re.IGNORECASE)
-                    new_q = pattern.sub(label, new_q)
+                new_q = column_pattern.sub(_column_label, new_q)
                 # Within parentheses, drop single quotes around tokens (e.g., 'Texas' -> Texas)
                 try:
-                    def _strip_quotes_inside_parens(m):
-                        inner = m.group(1)
-                        inner = _re.sub(r"'([^']+)'", r"\1", inner)
-                        return f"({inner})"
-                    new_q = _re.sub(r"\(([^)]*)\)", _strip_quotes_inside_parens, new_q)
+                    new_q = _PARENS_PAT.sub(_strip_quotes_inside_parens, new_q)
                 except Exception:
                     pass
                 # Collapse multiple spaces
-                new_q = _re.sub(r"\s{2,}", " ", new_q).strip()
+                new_q = _MULTISPACE_PAT.sub(" ", new_q).strip()
                 sanitized.append(new_q)
             return sanitized
         except Exception:
@@ -1868,6 +2038,16 @@ class GenerateInsights(Node):
         # Only generate insights if we have charts enabled and chart data
         if not shared.get("show_charts", False) or "chart_data" not in shared:
             return None
+        
+        # Pull view info (cached in db_utils) once; exec grounds follow-up questions in it
+        # and post uses its columns to sanitize them. Anything but a dict becomes the empty
+        # view info here so later steps can read it without type checks
+        try:
+            view_info = get_job_details_view_info(db_name=shared.get("db_name"))
+        except Exception:
+            view_info = None
+        if not isinstance(view_info, dict):
+            view_info = _EMPTY_VIEW_INFO
             
         return {
             "query": shared.get("query", ""),
@@ -1876,7 +2056,8 @@ class GenerateInsights(Node):
             "data_rows": shared.get("query_results", []) or [],
             "chart_type": shared.get("chart_data", {}).get("type", "chart") if shared.get("chart_data") else "chart",
             "db_name": shared.get("db_name"),
-            "chart_data": shared.get("chart_data", {})
+            "chart_data": shared.get("chart_data", {}),
+            "view_info": view_info
         }
     
     def exec(self, prep_res):
@@ -1886,8 +2067,6 @@ class GenerateInsights(Node):
             
         try:
             from gemini_utils import init_model, call_llm
-            import json
-            import re
             import math
             from collections import Counter
             
@@ -1901,14 +2080,9 @@ class GenerateInsights(Node):
             sql_query = prep_res.get("sql_query", "")
             data_rows = prep_res["data_rows"]
             chart_type = prep_res["chart_type"]
-            db_name = prep_res.get("db_name")
             
-            # Pull view info (cached in db_utils) to guide follow-up questions
-            view_info = {}
-            try:
-                view_info = get_job_details_view_info(db_name=db_name) or {}
-            except Exception:
-                view_info = {}
+            # View info fetched in prep guides follow-up questions
+            view_info = prep_res["view_info"]
             
             # Prepare analysis context focusing on actionable, name-specific insights (avoid simple min/max)
             data_summary = ""
@@ -1919,32 +2093,31 @@ class GenerateInsights(Node):
                 datasets = chart.get("datasets", [])
                 try:
                     series_summaries = []
+                    series_totals = []
                     for ds in datasets:
                         name = ds.get("label", "Series")
                         values = ds.get("data", [])
                         total = sum(v for v in values if isinstance(v, (int, float))) or 0
-                        pairs = [(labels[i], values[i]) for i in range(min(len(labels), len(values))) if isinstance(values[i], (int, float))]
-                        pairs_sorted = sorted(pairs, key=lambda x: x[1], reverse=True)
-                        top3 = [(p[0], p[1], round((p[1]/total)*100, 2) if total else 0) for p in pairs_sorted[:3]]
+                        series_totals.append(total)
+                        pairs = [(label, v) for label, v in zip(labels, values) if isinstance(v, (int, float))]
+                        # Only the three largest contributors are reported, so skip the full sort
+                        top_pairs = heapq.nlargest(3, pairs, key=itemgetter(1))
+                        top3 = [(p[0], p[1], round((p[1]/total)*100, 2) if total else 0) for p in top_pairs]
                         top3_str = "; ".join([f"{nm} ({val:,} | {pct}%)" for nm, val, pct in top3]) if top3 else ""
-                        top_share = round(sum(p[1] for p in pairs_sorted[:3]) / total * 100, 2) if total and len(pairs_sorted) >= 1 else 0
+                        top_share = round(sum(p[1] for p in top_pairs) / total * 100, 2) if total and len(top_pairs) >= 1 else 0
                         series_summaries.append(f"- {name}: top contributors → {top3_str}. Top 3 cover ~{top_share}% of total ({total:,}).")
                     ratio_lines = []
                     if len(datasets) >= 2:
                         s1 = datasets[0]; s2 = datasets[1]
                         n1 = s1.get("label", "Series 1"); n2 = s2.get("label", "Series 2")
                         vals1 = s1.get("data", []); vals2 = s2.get("data", [])
-                        ratios = []
-                        for i in range(min(len(labels), len(vals1), len(vals2))):
-                            a = vals1[i]; b = vals2[i]
-                            if isinstance(a, (int, float)) and isinstance(b, (int, float)) and a > 0:
-                                ratios.append((labels[i], b / a))
+                        ratios = [(label, b / a) for label, a, b in zip(labels, vals1, vals2)
+                                  if isinstance(a, (int, float)) and isinstance(b, (int, float)) and a > 0]
                         if ratios:
-                            ratios_sorted = sorted(ratios, key=lambda x: x[1], reverse=True)
-                            top_ratio = ratios_sorted[:3]
+                            top_ratio = heapq.nlargest(3, ratios, key=itemgetter(1))
                             ratio_lines.append("- Highest ratios (" + f"{n2} per {n1}" + "): " + "; ".join([f"{nm} ({round(r,2)})" for nm, r in top_ratio]))
-                            tot1 = sum(v for v in vals1 if isinstance(v, (int, float))) or 0
-                            tot2 = sum(v for v in vals2 if isinstance(v, (int, float))) or 0
+                            # Series totals were already summed above
+                            tot1, tot2 = series_totals[0], series_totals[1]
                             if tot1 > 0:
                                 ratio_lines.append(f"- Overall {n2}/{n1}: {round(tot2/tot1, 2)}")
                     computed_context = "\n".join(["Series concentration:"] + series_summaries + (["Cross-series signals:"] + ratio_lines if ratio_lines else []))
@@ -1955,23 +2128,27 @@ class GenerateInsights(Node):
                 num_rows = len(data_rows)
                 data_summary = f"Rows: {num_rows}\nColumns: {', '.join(columns)}"
             
-            chart_context = f" The data is visualized as a {chart_type} chart." if chart_type else ""
+            chart_context = f"**Chart**: The data is visualized as a {chart_type} chart.\n" if chart_type else ""
+            
+            # Wide results must not inflate the prompt without bound
+            data_summary = _clip(data_summary)
+            computed_context = _clip(computed_context)
             
             # Include constrained view info to ground follow-up questions to the available view
-            view_columns = []
-            if isinstance(view_info, dict):
-                view_columns = view_info.get("columns", [])
-            distinct_values = view_info.get("distinct_values", {}) if isinstance(view_info, dict) else {}
+            # Column list and example values are serialized once alongside the cached view info
+            view_columns_csv = view_info["columns_csv"]
+            example_values_json = view_info["example_values_json"]
 
-            prompt = f"""You are a data analyst AI assistant. Based on the user's query and the resulting data, provide:
+            # Text shared by every request against this view (instructions, then the view's
+            # columns and example values) comes first, ahead of the per-request details, so it
+            # forms one common prefix; a long enough view block lets provider prefix caching apply
+            prompt = f"""{_INSIGHTS_PROMPT_PREFIX}
+**View Columns**: {view_columns_csv}
 
-1. **Insights**: A concise, informative summary (2-3 sentences) highlighting key findings, trends, patterns, or notable observations from the data.{chart_context}
-
-2. **Follow-up Questions**: Generate 2-3 relevant follow-up questions that would help the user explore the data further. These must be:
-   - Directly related to the current dataset and the user's intent
-   - Feasible using ONLY the `GetJobDetails_FieldService` view columns
-   - Concrete (reference real column names and, when helpful, example values from the view)
+**Example Values (subset)**:
+{example_values_json}
 
+{chart_context}
 **User Query**: {query}
 
 **Underlying SQL (for context)**:
@@ -1981,80 +2158,41 @@ class GenerateInsights(Node):
 {data_summary}
 
 **Computed Context (beyond the chart)**:
-{computed_context}
-
-**View Columns**: {', '.join(view_columns) if view_columns else 'unknown'}
+{computed_context}"""
 
-**Example Values (subset)**:
-{json.dumps({k: v[:5] for k, v in distinct_values.items()}) if distinct_values else '{}'}
-
-**Guidelines**:
-- Insights should be specific and actionable, not generic
-- Follow-up questions must be executable against the `GetJobDetails_FieldService` view
-- Focus on business value and actionable insights
-- Keep insights concise but informative
-- Make follow-up questions specific enough to be directly actionable
-
-**Response Format**:
-Return a JSON object with exactly this structure:
-{{
-    "insights": "Your concise insights here (2-3 sentences)",
-    "follow_up_questions": [
-        "Specific follow-up question 1",
-        "Specific follow-up question 2", 
-        "Specific follow-up question 3"
-    ]
-}}
-
-**IMPORTANT**: Return ONLY the JSON object, no additional text."""
-
-            # Call the LLM
-            response_text = call_llm(prompt, temperature=0.1)
+            # Identical prompts (dashboard refreshes, retries) reuse the earlier parsed response
+            cache_key = hashlib.blake2b(prompt.encode("utf-8"), digest_size=16).digest()
+            cached = _get_cached_insights(cache_key)
+            if cached is not None:
+                return cached
+            
+            # Call the LLM, asking for bare JSON so the response parses without clean-up
+            response_text = call_llm(prompt, temperature=0.1, json_mode=True)
             
             # Extract JSON from response
             response_text = response_text.strip()
             
-            # Try to find JSON in the response
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                json_str = json_match.group()
-                try:
-                    result = json.loads(json_str)
-                    
-                    # Validate the response structure
-                    if "insights" in result and "follow_up_questions" in result:
-                        # Ensure follow_up_questions is a list
-                        if isinstance(result["follow_up_questions"], list):
-                            return result
-                        else:
-                            # Convert to list if it's not
-                            result["follow_up_questions"] = [str(result["follow_up_questions"])]
-                            return result
-                            
-                except json.JSONDecodeError:
-                    pass
+            # Find the JSON object in the response, ignoring any text around it
+            result = _extract_json_object(response_text)
+            
+            # Validate the response structure
+            if result is not None and "insights" in result and "follow_up_questions" in result:
+                # Ensure follow_up_questions is a list
+                if not isinstance(result["follow_up_questions"], list):
+                    # Convert to list if it's not
+                    result["follow_up_questions"] = [str(result["follow_up_questions"])]
+                _cache_insights(cache_key, result)
+                return result
             
             # Fallback if JSON parsing fails
-            return {
-                "insights": "Analysis completed successfully. The data shows the requested information based on your query.",
-                "follow_up_questions": [
-                    "What time period would you like to analyze next?",
-                    "Would you like to see this data broken down by different categories?",
-                    "What additional metrics would be helpful to compare?"
-                ]
-            }
+            insights, follow_ups = _INSIGHTS_PARSE_FALLBACK
+            return {"insights": insights, "follow_up_questions": list(follow_ups)}
             
         except Exception as e:
             logger.exception(f"Error generating insights: {e}")
             # Return fallback insights
-            return {
-                "insights": "Data analysis completed. The results show information relevant to your query.",
-                "follow_up_questions": [
-                    "What time period would you like to explore?",
-                    "Would you like to see different data groupings?",
-                    "What additional analysis would be helpful?"
-                ]
-            }
+            insights, follow_ups = _INSIGHTS_ERROR_FALLBACK
+            return {"insights": insights, "follow_up_questions": list(follow_ups)}
     
     def post(self, shared, prep_res, exec_res):
         # Skip if no insights were generated
@@ -2066,8 +2204,7 @@ Return a JSON object with exactly this structure:
             shared["insights"] = exec_res["insights"]
         if "follow_up_questions" in exec_res:
             # Sanitize to avoid exposing raw column names
-            db_name = shared.get("db_name")
-            shared["follow_up_questions"] = self._sanitize_followups(exec_res["follow_up_questions"], db_name)
+            shared["follow_up_questions"] = self._sanitize_followups(exec_res["follow_up_questions"], prep_res["view_info"])
             
         return "default"
 